@@ -53,9 +53,7 @@ import kotlinx.coroutines.launch
 import android.provider.OpenableColumns
 import kotlinx.serialization.ExperimentalSerializationApi
 import kotlinx.serialization.SerializationException
-import kotlinx.serialization.json.Json
-import kotlinx.serialization.json.decodeFromStream
-import it.palsoftware.pastiera.core.suggestions.DictionaryIndex
+import it.palsoftware.pastiera.core.suggestions.decodeDictionaryIndex
 
 /**
  * Activity that shows the list of serialized dictionaries bundled with the app.
@@ -328,10 +326,8 @@ private fun importDictionaryFromSaf(context: Context, uri: android.net.Uri): Imp
     }
 }
 
-@OptIn(ExperimentalSerializationApi::class)
 private fun validateDictionaryStream(input: InputStream) {
-    val json = Json { ignoreUnknownKeys = true }
-    json.decodeFromStream<DictionaryIndex>(input)
+    decodeDictionaryIndex(input)
 }
 
 private fun getLanguageDisplayName(languageCode: String): String {
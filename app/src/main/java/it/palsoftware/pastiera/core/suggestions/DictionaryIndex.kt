@@ -1,16 +1,27 @@
 package it.palsoftware.pastiera.core.suggestions
 
+import kotlinx.serialization.ExperimentalSerializationApi
 import kotlinx.serialization.Serializable
+import kotlinx.serialization.cbor.Cbor
+import kotlinx.serialization.decodeFromByteArray
+import kotlinx.serialization.json.Json
+import kotlinx.serialization.json.decodeFromStream
+import java.io.InputStream
 
 /**
  * Serialized dictionary index structure.
  * Contains pre-built normalized index and prefix cache for fast loading.
+ *
+ * SymSpell deletes come either as [symDeletes] (delete -> terms) or, in the compact
+ * layout, as [symTerms] plus [symDeleteIds] (delete -> delta-encoded sorted term IDs).
  */
 @Serializable
 data class DictionaryIndex(
     val normalizedIndex: Map<String, List<SerializableDictionaryEntry>>,
     val prefixCache: Map<String, List<SerializableDictionaryEntry>>,
     val symDeletes: Map<String, List<String>>? = null,
+    val symTerms: List<String>? = null,
+    val symDeleteIds: Map<String, List<Int>>? = null,
     val symMeta: SymSpellMeta? = null
 )
 
@@ -53,3 +64,38 @@ fun SerializableDictionaryEntry.toDictionaryEntry(): DictionaryEntry {
     )
 }
 
+/**
+ * Returns the SymSpell deletes as delete -> terms, expanding the compact
+ * ID-based layout if that is what the file contains.
+ */
+fun DictionaryIndex.resolveSymDeletes(): Map<String, List<String>>? {
+    symDeletes?.let { return it }
+    val terms = symTerms ?: return null
+    val deleteIds = symDeleteIds ?: return null
+    return deleteIds.mapValues { (_, deltas) ->
+        var id = 0
+        deltas.map { delta ->
+            id += delta
+            terms[id]
+        }
+    }
+}
+
+/**
+ * Decodes a serialized dictionary (.dict) from either JSON or CBOR.
+ * CBOR files (build_symspell_dict.py --format cbor) start with a map header byte.
+ */
+@OptIn(ExperimentalSerializationApi::class)
+fun decodeDictionaryIndex(input: InputStream): DictionaryIndex {
+    val buffered = input.buffered()
+    buffered.mark(1)
+    val firstByte = buffered.read()
+    buffered.reset()
+    return if (firstByte != -1 && (firstByte and 0xE0) == 0xA0) {
+        val cbor = Cbor { ignoreUnknownKeys = true }
+        cbor.decodeFromByteArray<DictionaryIndex>(buffered.readBytes())
+    } else {
+        val json = Json { ignoreUnknownKeys = true }
+        json.decodeFromStream<DictionaryIndex>(buffered)
+    }
+}
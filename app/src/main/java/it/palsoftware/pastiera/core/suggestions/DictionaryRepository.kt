@@ -9,8 +9,6 @@ import java.util.concurrent.CancellationException
 import kotlin.coroutines.coroutineContext
 import java.text.Normalizer
 import java.util.Locale
-import kotlinx.serialization.json.Json
-import kotlinx.serialization.json.decodeFromStream
 import kotlinx.serialization.ExperimentalSerializationApi
 import kotlinx.coroutines.sync.Mutex
 import kotlinx.coroutines.sync.withLock
@@ -332,8 +330,7 @@ class DictionaryRepository(
 
     @OptIn(ExperimentalSerializationApi::class)
     private fun decodeSerializedDictionary(input: InputStream) {
-        val json = Json { ignoreUnknownKeys = true }
-        val index = json.decodeFromStream<DictionaryIndex>(input)
+        val index = decodeDictionaryIndex(input)
         Log.i(tag, "Deserialized dictionary: normalizedIndex=${index.normalizedIndex.size}, prefixCache=${index.prefixCache.size}")
 
         normalizedIndex.clear()
@@ -347,7 +344,8 @@ class DictionaryRepository(
             prefixCache[prefix] = entries.map { it.toDictionaryEntry() }.toMutableList()
         }
 
-        if (index.symDeletes != null && index.symMeta != null) {
+        val symDeletes = index.resolveSymDeletes()
+        if (symDeletes != null && index.symMeta != null) {
             val engine = SymSpell(
                 maxEditDistance = index.symMeta.maxEditDistance,
                 prefixLength = index.symMeta.prefixLength
@@ -362,7 +360,7 @@ class DictionaryRepository(
                 list.add(term)
             }
             val expandedDeletes = mutableMapOf<String, MutableList<String>>()
-            index.symDeletes.forEach { (deleteKey, terms) ->
+            symDeletes.forEach { (deleteKey, terms) ->
                 val targets = LinkedHashSet<String>()
                 terms.forEach { t ->
                     if (termFrequencies.containsKey(t)) {
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers shared by the dictionary scripts: JSON I/O, word normalization,
+index construction and SymSpell delete generation.
+
+Imported by build_symspell_dict.py, backup_truncate_and_convert.py,
+preprocess_dictionaries.py and truncate_dict.py (run from the scripts/ directory).
+"""
+
+import functools
+import heapq
+import itertools
+import json
+import unicodedata
+from collections import defaultdict
+
+try:
+    import orjson  # optional, much faster for the multi-MB dictionaries
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # optional, streams base JSON arrays instead of loading them whole
+except ImportError:
+    ijson = None
+else:
+    # Only the C backend is worth it: the pure-Python one parses ~40x slower than orjson
+    if not ijson.backend.endswith("_c"):
+        ijson = None
+
+
+def load_json(path):
+    """Read a JSON file, using orjson when available."""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_json_array(path) -> bool:
+    """True if the JSON file's top-level value is an array (the base word-list format)."""
+    with open(path, "rb") as f:
+        head = f.read(64).lstrip()
+    return head.startswith(b"[")
+
+
+def iter_json_array(path):
+    """Yield the items of a top-level JSON array, streamed with ijson's C backend when available."""
+    if ijson is None:
+        data = load_json(path)
+        if not isinstance(data, list):
+            raise ValueError(f"Expected JSON array, got {type(data)}")
+        yield from data
+        return
+    if not is_json_array(path):
+        raise ValueError(f"Expected JSON array in {path}")
+    with open(path, "rb") as f:
+        yield from ijson.items(f, "item", use_float=True)
+
+
+def entry_frequency(entry) -> int:
+    """Frequency of a base JSON entry ("f" may be stored as a string)."""
+    return int(entry.get("f", 0))
+
+
+def truncate_entries(path, max_words: int):
+    """Top max_words entries of a base JSON word list by frequency (descending).
+
+    Returns (top entries, total entry count); same result as a stable full sort + slice.
+    """
+    # Stream the entries so only the top-N heap is held in memory; zip() stops
+    # pulling from the counter once the entries run out, so it ends at the total
+    counter = itertools.count()
+    entries = (entry for entry, _ in zip(iter_json_array(path), counter))
+    top = heapq.nlargest(max_words, entries, key=entry_frequency)
+    return top, next(counter)
+
+
+def dumps_json(obj) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dump_json(obj, path, indent: bool = False):
+    """Write obj as UTF-8 JSON (compact, or 2-space indented), using orjson when available."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        if indent:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+        else:
+            json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def entry_objects(bucket):
+    """Expand (word, frequency, source) tuples into the keyed entries the app reads."""
+    return [{"word": word, "frequency": freq, "source": source} for word, freq, source in bucket]
+
+
+def write_entry_index(f, index):
+    """Stream a key -> entry tuples mapping as JSON, one bucket at a time."""
+    f.write(b"{")
+    for i, (key, bucket) in enumerate(index.items()):
+        if i:
+            f.write(b",")
+        f.write(dumps_json(key))
+        f.write(b":")
+        f.write(dumps_json(entry_objects(bucket)))
+    f.write(b"}")
+
+
+def _normalize_slow(word: str) -> str:
+    """NFD, strip combining marks, keep only letters (expects a lowercased word)."""
+    category = unicodedata.category
+    # Combining marks are "Mn", not "L*", so one letter filter also strips accents
+    return "".join(ch for ch in unicodedata.normalize("NFD", word) if category(ch)[0] == "L")
+
+
+# NFD decomposes each character on its own, so for Latin, Greek and Cyrillic
+# (everything below U+0530) the slow path can be precomputed per codepoint.
+_FAST_LIMIT = "\u0530"
+_FAST_TABLE = {}
+for _cp in range(ord(_FAST_LIMIT)):
+    _stripped = _normalize_slow(chr(_cp))
+    if _stripped != chr(_cp):
+        _FAST_TABLE[_cp] = _stripped
+
+
+def normalize(word: str, locale: str = "it") -> str:
+    """Normalize word (matches Kotlin implementation): lowercase, remove accents, keep only letters."""
+    word = word.lower()
+    if not word or max(word) < _FAST_LIMIT:
+        return word.translate(_FAST_TABLE)
+    return _normalize_slow(word)
+
+
+def build_indices(entries, prefix_length: int = 4):
+    """Build (normalized_index, prefix_cache) from (normalized, word, frequency) tuples.
+
+    Both map a key to a list of (word, frequency, source) tuples; words keep their
+    original case. The prefix cache holds every prefix up to prefix_length chars
+    and is filled once per normalized term.
+    """
+    normalized_index = defaultdict(list)
+    for normalized, word, freq in entries:
+        normalized_index[normalized].append((word, freq, 0))  # source 0 = MAIN
+    prefix_cache = defaultdict(list)
+    for normalized, bucket in normalized_index.items():
+        # accumulate("casa") yields "c", "ca", "cas", "casa" without re-slicing normalized
+        for prefix in itertools.accumulate(normalized[:prefix_length]):
+            prefix_cache[prefix].extend(bucket)
+    return normalized_index, prefix_cache
+
+
+def _deletes_4_2(term: str):
+    """Deletes within distance 2 of a 4-char term: its 4 three-char and 6 two-char subsequences."""
+    a, b, c, d = term
+    return frozenset((
+        b + c + d, a + c + d, a + b + d, a + b + c,
+        c + d, b + d, b + c, a + d, a + c, a + b,
+    ))
+
+
+@functools.lru_cache(maxsize=None)
+def generate_deletes(term: str, max_distance: int):
+    """Generate all delete variants for SymSpell (cached, many words share a prefix)."""
+    # Every full-length key with the default prefix_length=4, max_edit_distance=2
+    if max_distance == 2 and len(term) == 4:
+        return _deletes_4_2(term)
+    # Level-by-level: each distance only expands the unique strings of the previous one
+    deletes = set()
+    frontier = {term}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for current in frontier:
+            for i in range(len(current)):
+                next_frontier.add(current[:i] + current[i + 1 :])
+        deletes |= next_frontier
+        frontier = next_frontier
+    return frozenset(deletes)
+
+
+def build_sym_deletes(terms, prefix_length: int, max_edit_distance: int):
+    """Map each SymSpell delete to the set of term IDs (indices into terms) it reaches."""
+    # Group term IDs by prefix so deletes are generated once per unique key
+    prefix_to_ids = defaultdict(list)
+    for term_id, term in enumerate(terms):
+        prefix_to_ids[term[:prefix_length]].append(term_id)
+
+    deletes = defaultdict(set)
+    for key, term_ids in prefix_to_ids.items():
+        for d in generate_deletes(key, max_edit_distance):
+            # Store full normalized term (matches SymSpell.addWord behavior)
+            deletes[d].update(term_ids)
+    return deletes
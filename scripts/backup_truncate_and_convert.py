@@ -13,38 +13,14 @@ Usage:
 """
 
 import argparse
-import json
+import hashlib
+import multiprocessing
 import os
 import shutil
 from pathlib import Path
-from collections import defaultdict
-import unicodedata
 
-
-def normalize(word: str, locale: str = "it") -> str:
-    """Normalize word (matches Kotlin implementation)."""
-    word = word.lower()
-    word = unicodedata.normalize("NFD", word)
-    word = "".join(ch for ch in word if unicodedata.category(ch) != "Mn")
-    word = "".join(ch for ch in word if unicodedata.category(ch).startswith("L"))
-    return word
-
-
-def generate_deletes(term: str, max_distance: int):
-    """Generate all delete variants for SymSpell."""
-    deletes = set()
-
-    def recurse(current: str, d: int):
-        if d == 0:
-            return
-        for i in range(len(current)):
-            deleted = current[:i] + current[i + 1 :]
-            if deleted not in deletes:
-                deletes.add(deleted)
-                recurse(deleted, d - 1)
-
-    recurse(term, max_distance)
-    return deletes
+from _symspell_common import dump_json, truncate_entries
+from build_symspell_dict import build_from_data
 
 
 def backup_dictionaries(project_root: Path, backup_dir: Path):
@@ -69,78 +45,86 @@ def backup_dictionaries(project_root: Path, backup_dir: Path):
     
     for json_file in json_files:
         backup_path = backup_dir / json_file.name
-        shutil.copy2(json_file, backup_path)
+        # Contents only: copyfile skips the metadata syscalls and uses in-kernel copies where available
+        shutil.copyfile(json_file, backup_path)
         print(f"  Backed up: {json_file.name}")
     
     print(f"Backup completed!\n")
     return True
 
 
-def truncate_dictionary(input_path: Path, max_words: int):
-    """Load and truncate dictionary to top N words."""
-    with open(input_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    
-    if not isinstance(data, list):
-        raise ValueError(f"Expected JSON array, got {type(data)}")
-    
-    original_count = len(data)
-    
-    # Sort by frequency (descending)
-    sorted_data = sorted(data, key=lambda x: int(x.get("f", 0)), reverse=True)
-    
-    # Take top N words
-    truncated = sorted_data[:max_words]
-    
-    return truncated, original_count
-
-
-def convert_to_symspell(data: list, max_edit_distance: int = 2, prefix_length: int = 4):
-    """Convert dictionary data to SymSpell format."""
-    normalized_index = {}
-    prefix_cache = {}
-    
-    for entry in data:
-        # IMPORTANT: Preserve original case (uppercase/lowercase) from JSON
-        # e.g., {"w": "Mario", "f": 100} -> word="Mario" (not "mario")
-        # normalize() only converts to lowercase for indexing purposes
-        w = entry["w"]  # Original case preserved
-        f = int(entry.get("f", 1))
-        norm = normalize(w)  # lowercase for indexing only
-        # Save original word with case preserved for dictionary entry
-        normalized_index.setdefault(norm, []).append({"word": w, "frequency": f, "source": 0})
-        # prefix cache up to prefix_length chars
-        for l in range(1, min(len(norm), prefix_length) + 1):
-            prefix_cache.setdefault(norm[:l], []).append({"word": w, "frequency": f, "source": 0})
-    
-    # Generate deletes
-    deletes = defaultdict(set)
-    for norm, entries in normalized_index.items():
-        freq = max(e["frequency"] for e in entries)
-        key = norm[:prefix_length]
-        for d in generate_deletes(key, max_edit_distance):
-            deletes[d].add(key)
-    
-    sym_deletes = {k: sorted(v) for k, v in deletes.items()}
-    sym_meta = {
-        "maxEditDistance": max_edit_distance,
-        "prefixLength": prefix_length,
-    }
-    
-    return {
-        "normalizedIndex": normalized_index,
-        "prefixCache": prefix_cache,
-        "symDeletes": sym_deletes,
-        "symMeta": sym_meta,
-    }
-
-
-def process_dictionaries(project_root: Path, max_words: int, max_edit_distance: int, prefix_length: int):
+def dictionary_fingerprint(path: Path, *params) -> str:
+    """Hash of a file's bytes together with the conversion parameters (if any)."""
+    digest = hashlib.sha1(":".join(str(p) for p in params).encode())
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def process_one(
+    json_file: Path,
+    output_dir: Path,
+    max_words: int,
+    max_edit_distance: int,
+    prefix_length: int,
+    output_format: str = "json",
+    force: bool = False,
+):
+    """Truncate and convert a single dictionary. Returns (language, ok, log lines)."""
+    language = json_file.stem.replace("_base", "")
+    log = [f"Processing {language}..."]
+    
+    dict_file = output_dir / f"{language}_base.dict"
+    # Dotfile so it is never packaged with the assets
+    stamp_file = output_dir / f".{language}_base.stamp"
+    params = (max_words, max_edit_distance, prefix_length, output_format)
+    
+    try:
+        # Skip languages whose truncated JSON and .dict are both still what the last
+        # run wrote; other scripts (preprocess, convert_all) rewrite the same .dict
+        if not force and dict_file.exists() and stamp_file.exists():
+            expected = [dictionary_fingerprint(json_file, *params), dictionary_fingerprint(dict_file)]
+            if stamp_file.read_text().split() == expected:
+                log.append("  unchanged, skip")
+                return language, True, log
+        
+        # Truncate
+        truncated, original_count = truncate_entries(json_file, max_words)
+        log.append(f"  Truncated from {original_count} to {len(truncated)} words")
+        
+        # Write truncated JSON back
+        dump_json(truncated, json_file, indent=True)
+        log.append(f"  Updated {json_file.name}")
+        
+        # Convert the in-memory list to SymSpell and write the .dict file
+        bucket_count = build_from_data(truncated, dict_file, max_edit_distance, prefix_length, output_format)
+        
+        log.append(f"  Created {dict_file.name} with {bucket_count} delete buckets")
+        
+        # Fingerprint the JSON and .dict as written, so an identical re-run is a no-op
+        stamp_file.write_text(
+            dictionary_fingerprint(json_file, *params) + "\n" + dictionary_fingerprint(dict_file) + "\n"
+        )
+        return language, True, log
+        
+    except Exception as e:
+        log.append(f"  ERROR processing {language}: {e}")
+        return language, False, log
+
+
+def process_dictionaries(
+    project_root: Path,
+    max_words: int,
+    max_edit_distance: int,
+    prefix_length: int,
+    output_format: str = "json",
+    force: bool = False,
+):
     """Process all dictionaries: truncate and convert."""
     dictionaries_dir = project_root / "app" / "src" / "main" / "assets" / "common" / "dictionaries"
     output_dir = project_root / "app" / "src" / "main" / "assets" / "common" / "dictionaries_serialized"
     
-    json_files = list(dictionaries_dir.glob("*_base.json"))
+    json_files = sorted(dictionaries_dir.glob("*_base.json"))
     
     if not json_files:
         print(f"ERROR: No dictionary JSON files found")
@@ -150,34 +134,22 @@ def process_dictionaries(project_root: Path, max_words: int, max_edit_distance:
     
     print(f"Processing {len(json_files)} dictionaries...\n")
     
-    for json_file in json_files:
-        language = json_file.stem.replace("_base", "")
-        print(f"Processing {language}...")
-        
-        try:
-            # Truncate
-            truncated, original_count = truncate_dictionary(json_file, max_words)
-            print(f"  Truncated from {original_count} to {len(truncated)} words")
-            
-            # Write truncated JSON back
-            with open(json_file, "w", encoding="utf-8") as f:
-                json.dump(truncated, f, ensure_ascii=False, indent=2)
-            print(f"  Updated {json_file.name}")
-            
-            # Convert to SymSpell
-            symspell_dict = convert_to_symspell(truncated, max_edit_distance, prefix_length)
-            
-            # Write .dict file
-            dict_file = output_dir / f"{language}_base.dict"
-            with open(dict_file, "w", encoding="utf-8") as f:
-                json.dump(symspell_dict, f, ensure_ascii=False)
-            
-            print(f"  Created {dict_file.name} with {len(symspell_dict['symDeletes'])} delete buckets")
+    # Languages are independent and CPU-bound: process them in parallel
+    tasks = [
+        (json_file, output_dir, max_words, max_edit_distance, prefix_length, output_format, force)
+        for json_file in json_files
+    ]
+    failed = []
+    with multiprocessing.Pool(min(len(tasks), os.cpu_count() or 1)) as pool:
+        for language, ok, log in pool.starmap(process_one, tasks):
+            print("\n".join(log))
             print()
-            
-        except Exception as e:
-            print(f"  ERROR processing {language}: {e}\n")
-            return False
+            if not ok:
+                failed.append(language)
+    
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+        return False
     
     print("All dictionaries processed successfully!")
     return True
@@ -205,6 +177,17 @@ def main():
         default=4,
         help="SymSpell prefix length (default: 4)"
     )
+    parser.add_argument(
+        "--format",
+        choices=["json", "cbor"],
+        default="json",
+        help="Encoding of the .dict files: json or binary cbor, requires cbor2 (default: json)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every dictionary, even those unchanged since the last run"
+    )
     parser.add_argument(
         "--project_root",
         type=str,
@@ -226,6 +209,7 @@ def main():
     print(f"Project root: {project_root}")
     print(f"Backup directory: {backup_dir}")
     print(f"Max words: {args.max_words}")
+    print(f"Output format: {args.format}")
     print()
     
     # Step 1: Backup
@@ -233,7 +217,9 @@ def main():
         return 1
     
     # Step 2: Truncate and convert
-    if not process_dictionaries(project_root, args.max_words, args.max_edit_distance, args.prefix_length):
+    if not process_dictionaries(
+        project_root, args.max_words, args.max_edit_distance, args.prefix_length, args.format, args.force
+    ):
         return 1
     
     print("\nDone! Original dictionaries backed up to dict_backup/")
@@ -4,7 +4,11 @@
 Precompute SymSpell deletes and write an extended .dict file.
 
 Input: an existing serialized dictionary JSON (the current .dict) or a base JSON (w/f list).
-Output: JSON with fields: normalizedIndex, prefixCache, symDeletes, symMeta.
+Output: JSON with fields: normalizedIndex, prefixCache, symTerms, symDeleteIds, symMeta.
+symTerms lists each SymSpell term once; symDeleteIds maps a delete to the
+delta-encoded, sorted indices of its terms in symTerms.
+
+Pass --format cbor to write the same structure as CBOR (smaller and faster to decode).
 
 Usage examples:
     python scripts/build_symspell_dict.py --input app/src/main/assets/common/dictionaries_serialized/it_base.dict \
@@ -15,100 +19,196 @@ Usage examples:
 """
 
 import argparse
-import json
 import os
 import re
-import unicodedata
-from collections import defaultdict
-
-
-def normalize(word: str, locale: str = "it") -> str:
-    # Align with Kotlin: lowercase, NFD, strip combining marks, keep only letters
-    word = word.lower()
-    word = unicodedata.normalize("NFD", word)
-    # Remove combining marks
-    word = "".join(ch for ch in word if unicodedata.category(ch) != "Mn")
-    # Keep only letters (unicode)
-    word = "".join(ch for ch in word if unicodedata.category(ch).startswith("L"))
-    return word
-
 
-def generate_deletes(term: str, max_distance: int):
-    deletes = set()
-
-    def recurse(current: str, d: int):
-        if d == 0:
-            return
-        for i in range(len(current)):
-            deleted = current[:i] + current[i + 1 :]
-            if deleted not in deletes:
-                deletes.add(deleted)
-                recurse(deleted, d - 1)
-
-    recurse(term, max_distance)
-    return deletes
+from _symspell_common import (
+    build_indices,
+    build_sym_deletes,
+    dumps_json,
+    entry_objects,
+    load_json,
+    normalize,
+    write_entry_index,
+)
+
+try:
+    import cbor2  # optional, only needed for --format cbor
+except ImportError:
+    cbor2 = None
+
+
+def delta_encode(ids):
+    """Encode sorted ints as first value + successive differences."""
+    return [b - a for a, b in zip([0] + ids, ids)]
+
+
+def write_symspell_dict(path, symspell_dict, output_format: str = "json"):
+    """Write a SymSpell .dict to disk as JSON (streamed) or CBOR.
+
+    normalizedIndex and prefixCache hold (word, frequency, source) tuples, written
+    as the keyed entry objects the app reads. symTerms is the sorted term list (the
+    list index is the term ID) and symDeletes maps each delete to an unsorted set of
+    term IDs; each bucket is written as a delta-encoded sorted list in symDeleteIds.
+    Deletes are written in sorted order, so the output does not depend on string
+    hash randomization. JSON buckets are encoded one at a time so the full sorted
+    mapping is never held in memory.
+    """
+    deletes = symspell_dict["symDeletes"]
+    terms = symspell_dict["symTerms"]
+
+    def bucket_ids(bucket):
+        return delta_encode(sorted(bucket))
+
+    if output_format == "cbor":
+        if cbor2 is None:
+            raise RuntimeError("CBOR output requires the cbor2 package (pip install cbor2)")
+        with open(path, "wb") as f:
+            cbor2.dump({
+                "normalizedIndex": {k: entry_objects(v) for k, v in symspell_dict["normalizedIndex"].items()},
+                "prefixCache": {k: entry_objects(v) for k, v in symspell_dict["prefixCache"].items()},
+                "symTerms": terms,
+                "symDeleteIds": {delete: bucket_ids(deletes[delete]) for delete in sorted(deletes)},
+                "symMeta": symspell_dict["symMeta"],
+            }, f)
+        return
+
+    with open(path, "wb") as f:
+        f.write(b'{"normalizedIndex":')
+        write_entry_index(f, symspell_dict["normalizedIndex"])
+        f.write(b',"prefixCache":')
+        write_entry_index(f, symspell_dict["prefixCache"])
+        f.write(b',"symTerms":')
+        f.write(dumps_json(terms))
+        f.write(b',"symDeleteIds":{')
+        for i, delete in enumerate(sorted(deletes)):
+            if i:
+                f.write(b",")
+            f.write(dumps_json(delete))
+            f.write(b":")
+            f.write(dumps_json(bucket_ids(deletes[delete])))
+        f.write(b'},"symMeta":')
+        f.write(dumps_json(symspell_dict["symMeta"]))
+        f.write(b"}")
+
+
+def is_cbor_file(path: str) -> bool:
+    # A CBOR .dict starts with a map header (major type 5); JSON starts with "{" or "["
+    with open(path, "rb") as f:
+        head = f.read(1)
+    return bool(head) and head[0] & 0xE0 == 0xA0
+
+
+def index_entries(entries):
+    """Build normalizedIndex and prefixCache from base JSON entries [{w,f}]."""
+    # IMPORTANT: Preserve original case (uppercase/lowercase) from JSON
+    # e.g., {"w": "Mario", "f": 100} -> word="Mario" (not "mario")
+    # normalize() only converts to lowercase for indexing purposes
+    normalized_entries = ((normalize(e["w"]), e["w"], int(e.get("f", 1))) for e in entries)
+    # prefix cache up to 4 chars (matches cachePrefixLength default)
+    normalized_index, prefix_cache = build_indices(normalized_entries, 4)
+    return {"normalizedIndex": normalized_index, "prefixCache": prefix_cache}
 
 
 def load_input(path: str):
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    if isinstance(data, list):
+    if is_cbor_file(path):
+        if cbor2 is None:
+            raise RuntimeError("Reading a CBOR .dict requires the cbor2 package (pip install cbor2)")
+        with open(path, "rb") as f:
+            data = cbor2.load(f)
+    else:
+        data = load_json(path)
+    if not isinstance(data, dict):
         # base JSON format [{w,f}]
-        normalized_index = {}
-        prefix_cache = {}
-        for entry in data:
-            # IMPORTANT: Preserve original case (uppercase/lowercase) from JSON
-            # e.g., {"w": "Mario", "f": 100} -> word="Mario" (not "mario")
-            # normalize() only converts to lowercase for indexing purposes
-            w = entry["w"]
-            f = int(entry.get("f", 1))
-            norm = normalize(w)  # lowercase for indexing only
-            # Save original word with case preserved for dictionary entry
-            normalized_index.setdefault(norm, []).append({"word": w, "frequency": f, "source": 0})
-            # prefix cache up to 4 chars (matches cachePrefixLength default)
-            for l in range(1, min(len(norm), 4) + 1):
-                prefix_cache.setdefault(norm[:l], []).append({"word": w, "frequency": f, "source": 0})
-        return {"normalizedIndex": normalized_index, "prefixCache": prefix_cache}
+        return index_entries(data)
     else:
         # assume already in DictionaryIndex shape (case should already be preserved)
-        return data
-
-
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--input", required=True, help="Path to base json or existing .dict")
-    parser.add_argument("--output", required=True, help="Path to write the extended .dict")
-    parser.add_argument("--max_edit_distance", type=int, default=2)
-    parser.add_argument("--prefix_length", type=int, default=4)
-    args = parser.parse_args()
-
-    data = load_input(args.input)
+        def entry_tuples(index):
+            return {
+                key: [(e["word"], e["frequency"], e.get("source", 0)) for e in bucket]
+                for key, bucket in index.items()
+            }
+
+        return {
+            "normalizedIndex": entry_tuples(data["normalizedIndex"]),
+            "prefixCache": entry_tuples(data.get("prefixCache", {})),
+        }
+
+
+def build(
+    input_path: str,
+    output_path: str,
+    max_edit_distance: int = 2,
+    prefix_length: int = 4,
+    output_format: str = "json",
+) -> int:
+    """Build the extended .dict for input_path and write it to output_path.
+
+    Returns the number of delete buckets written.
+    """
+    return build_from_index(load_input(input_path), output_path, max_edit_distance, prefix_length, output_format)
+
+
+def build_from_data(
+    data,
+    output_path: str,
+    max_edit_distance: int = 2,
+    prefix_length: int = 4,
+    output_format: str = "json",
+) -> int:
+    """Like build(), for base JSON entries [{w,f}] that are already in memory."""
+    return build_from_index(index_entries(data), output_path, max_edit_distance, prefix_length, output_format)
+
+
+def build_from_index(
+    data,
+    output_path: str,
+    max_edit_distance: int = 2,
+    prefix_length: int = 4,
+    output_format: str = "json",
+) -> int:
+    """Add SymSpell deletes to a {normalizedIndex, prefixCache} index and write it."""
     normalized_index = data["normalizedIndex"]
 
-    deletes = defaultdict(set)
-    for norm, entries in normalized_index.items():
-        key = norm[: args.prefix_length]
-        for d in generate_deletes(key, args.max_edit_distance):
-            # Store full normalized term (matches SymSpell.addWord behavior)
-            deletes[d].add(norm)
+    # Work on integer term IDs rather than strings: buckets then hash, merge and
+    # sort ints, and the writer needs no term -> ID remapping.
+    terms = sorted(normalized_index)
+    deletes = build_sym_deletes(terms, prefix_length, max_edit_distance)
 
-    sym_deletes = {k: sorted(v) for k, v in deletes.items()}
     sym_meta = {
-        "maxEditDistance": args.max_edit_distance,
-        "prefixLength": args.prefix_length,
+        "maxEditDistance": max_edit_distance,
+        "prefixLength": prefix_length,
     }
 
     out = {
         "normalizedIndex": normalized_index,
         "prefixCache": data.get("prefixCache", {}),
-        "symDeletes": sym_deletes,
+        "symTerms": terms,
+        "symDeletes": deletes,
         "symMeta": sym_meta,
     }
 
-    os.makedirs(os.path.dirname(args.output), exist_ok=True)
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(out, f, ensure_ascii=False)
-    print(f"Written {args.output} with {len(sym_deletes)} delete buckets")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    write_symspell_dict(output_path, out, output_format)
+    return len(deletes)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", required=True, help="Path to base json or existing .dict")
+    parser.add_argument("--output", required=True, help="Path to write the extended .dict")
+    parser.add_argument("--max_edit_distance", type=int, default=2)
+    parser.add_argument("--prefix_length", type=int, default=4)
+    parser.add_argument(
+        "--format",
+        choices=["json", "cbor"],
+        default="json",
+        help="Encoding of the .dict: json or binary cbor, requires cbor2 (default: json)",
+    )
+    args = parser.parse_args()
+
+    bucket_count = build(args.input, args.output, args.max_edit_distance, args.prefix_length, args.format)
+    print(f"Written {args.output} with {bucket_count} delete buckets")
 
 
 if __name__ == "__main__":
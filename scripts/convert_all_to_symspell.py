@@ -4,17 +4,18 @@
 Convert all dictionary JSON base files to SymSpell .dict format.
 
 This script processes all *_base.json files and converts them to .dict format
-using build_symspell_dict.py.
+using build_symspell_dict.build(), one worker process per core.
 
 Usage:
     python scripts/convert_all_to_symspell.py
 """
 
+import multiprocessing
 import os
-import subprocess
-import sys
 from pathlib import Path
 
+from build_symspell_dict import build
+
 
 def find_project_root():
     """Find project root directory."""
@@ -22,20 +23,35 @@ def find_project_root():
     return script_dir.parent
 
 
+def convert_one(input_path, output_path):
+    """Convert a single dictionary in-process. Returns (language, ok, log lines)."""
+    language = input_path.stem.replace("_base", "")
+    log = [
+        f"Processing {language}...",
+        f"  Input:  {input_path}",
+        f"  Output: {output_path}",
+    ]
+    
+    try:
+        bucket_count = build(str(input_path), str(output_path))
+        log.append(f"  ✓ Success")
+        log.append(f"  Written {output_path} with {bucket_count} delete buckets")
+        return language, True, log
+        
+    except Exception as e:
+        log.append(f"  ✗ Exception: {e}")
+        return language, False, log
+
+
 def main():
     project_root = find_project_root()
     dictionaries_dir = project_root / "app" / "src" / "main" / "assets" / "common" / "dictionaries"
     output_dir = project_root / "app" / "src" / "main" / "assets" / "common" / "dictionaries_serialized"
-    script_path = project_root / "scripts" / "build_symspell_dict.py"
     
     if not dictionaries_dir.exists():
         print(f"ERROR: Dictionaries directory not found: {dictionaries_dir}")
         return 1
     
-    if not script_path.exists():
-        print(f"ERROR: Script not found: {script_path}")
-        return 1
-    
     # Find all *_base.json files
     json_files = list(dictionaries_dir.glob("*_base.json"))
     
@@ -45,47 +61,20 @@ def main():
     
     print(f"Found {len(json_files)} dictionaries to process...\n")
     
+    # Languages are independent and CPU-bound: build them in parallel
+    tasks = [(json_file, output_dir / f"{json_file.stem}.dict") for json_file in sorted(json_files)]
+    with multiprocessing.Pool(min(len(tasks), os.cpu_count() or 1)) as pool:
+        results = pool.starmap(convert_one, tasks)
+    
     success_count = 0
     failed = []
-    
-    for json_file in sorted(json_files):
-        language = json_file.stem.replace("_base", "")
-        input_path = json_file
-        output_path = output_dir / f"{language}_base.dict"
-        
-        print(f"Processing {language}...")
-        print(f"  Input:  {input_path}")
-        print(f"  Output: {output_path}")
-        
-        try:
-            # Run build_symspell_dict.py
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    str(script_path),
-                    "--input", str(input_path),
-                    "--output", str(output_path)
-                ],
-                cwd=str(project_root),
-                capture_output=True,
-                text=True,
-                encoding="utf-8"
-            )
-            
-            if result.returncode == 0:
-                print(f"  ✓ Success")
-                print(f"  {result.stdout.strip()}")
-                success_count += 1
-            else:
-                print(f"  ✗ Failed")
-                print(f"  Error: {result.stderr}")
-                failed.append(language)
-            print()
-            
-        except Exception as e:
-            print(f"  ✗ Exception: {e}")
+    for language, ok, log in results:
+        print("\n".join(log))
+        print()
+        if ok:
+            success_count += 1
+        else:
             failed.append(language)
-            print()
     
     print("=" * 50)
     print(f"Processed: {success_count}/{len(json_files)} dictionaries")
@@ -99,5 +88,3 @@ def main():
 
 if __name__ == "__main__":
     exit(main())
-
-
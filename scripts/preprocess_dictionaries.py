@@ -4,40 +4,30 @@ Pre-process JSON dictionaries into serialized format for faster loading.
 Converts *_base.json files to *_base.dict files (JSON serialized format).
 """
 
-import json
+import contextlib
+import heapq
+import io
+import multiprocessing
+import operator
 import os
 import sys
+import traceback
 from pathlib import Path
-import unicodedata
 import re
 
-def normalize(word, locale='it'):
-    """Normalize word: lowercase, remove accents, keep only letters."""
-    # Convert to lowercase
-    word_lower = word.lower()
-    
-    # Normalize to NFD (decomposed form)
-    normalized = unicodedata.normalize('NFD', word_lower)
-    
-    # Remove combining marks (accents) and keep only Unicode letters
-    only_letters = ''.join(
-        c for c in normalized 
-        if unicodedata.category(c) == 'Ll' or unicodedata.category(c) == 'Lu' or unicodedata.category(c) == 'Lt' or
-           unicodedata.category(c) == 'Lo' or unicodedata.category(c) == 'Lm' or unicodedata.category(c) == 'Mn'
-    )
-    
-    # Remove combining marks (accents) - second pass
-    without_accents = ''.join(c for c in only_letters if unicodedata.category(c) != 'Mn')
-    
-    return without_accents
+from _symspell_common import build_indices, load_json, normalize, write_entry_index
+
+# Entries kept per prefix bucket. The keyboard reads at most 120 distinct words from
+# the merged prefix buckets (SuggestionEngine -> lookupByPrefixMerged), so anything
+# past this is never shown; the margin covers casing/accent duplicates.
+PREFIX_CACHE_TOP_K = 256
 
 def process_dictionary(json_file_path, output_dir):
     """Process a single dictionary JSON file."""
     print(f"Processing {json_file_path.name}...")
     
     # Read JSON file
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_json(json_file_path)
     
     print(f"  Loaded {len(data)} entries")
     
@@ -45,55 +35,36 @@ def process_dictionary(json_file_path, output_dir):
     language = json_file_path.stem.replace('_base', '')
     
     # Build indices
-    normalized_index = {}
-    prefix_cache = {}
     cache_prefix_length = 4
     
-    for entry in data:
-        # IMPORTANT: Preserve original case (uppercase/lowercase) from JSON
-        # e.g., {"w": "Mario", "f": 100} -> word="Mario" (not "mario")
-        # normalize() only converts to lowercase for indexing purposes
-        word = entry['w']  # Original case preserved
-        freq = entry.get('f', 1)
-        
-        # Normalize word (lowercase for indexing only)
-        normalized = normalize(word, language)
-        
-        # Add to normalized index - word keeps original case
-        if normalized not in normalized_index:
-            normalized_index[normalized] = []
-        normalized_index[normalized].append({
-            'word': word,  # Original case preserved (e.g., "Mario", "Roma", "casa")
-            'frequency': freq,
-            'source': 0  # 0 = MAIN
-        })
-        
-        # Add to prefix cache - word keeps original case
-        max_prefix_length = min(len(normalized), cache_prefix_length)
-        for length in range(1, max_prefix_length + 1):
-            prefix = normalized[:length]
-            if prefix not in prefix_cache:
-                prefix_cache[prefix] = []
-            prefix_cache[prefix].append({
-                'word': word,  # Original case preserved
-                'frequency': freq,
-                'source': 0
-            })
-    
-    # Sort prefix cache by frequency (descending)
-    for prefix in prefix_cache:
-        prefix_cache[prefix].sort(key=lambda x: x['frequency'], reverse=True)
-    
-    # Create serializable index
-    serializable_index = {
-        'normalizedIndex': normalized_index,
-        'prefixCache': prefix_cache
+    # IMPORTANT: Preserve original case (uppercase/lowercase) from JSON
+    # e.g., {"w": "Mario", "f": 100} -> word="Mario" (not "mario")
+    # normalize() only converts to lowercase for indexing purposes
+    # Normalize each word once, then insert in lexicographic order of the normalized
+    # key so consecutive inserts hit the same buckets (stable sort keeps source order).
+    entries = [(normalize(entry['w'], language), entry['w'], entry.get('f', 1)) for entry in data]
+    entries.sort(key=operator.itemgetter(0))
+    
+    # Words keep original case (e.g., "Mario", "Roma", "casa") in both indices
+    normalized_index, prefix_cache = build_indices(entries, cache_prefix_length)
+    
+    # Keep only the most frequent entries per prefix, sorted by frequency (descending)
+    by_frequency = operator.itemgetter(1)
+    prefix_cache = {
+        prefix: heapq.nlargest(PREFIX_CACHE_TOP_K, bucket, key=by_frequency)
+        if len(bucket) > PREFIX_CACHE_TOP_K
+        else sorted(bucket, key=by_frequency, reverse=True)
+        for prefix, bucket in prefix_cache.items()
     }
     
-    # Serialize to JSON (compact format)
+    # Serialize to JSON (compact format), expanding entries bucket by bucket
     output_file = output_dir / f"{language}_base.dict"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(serializable_index, f, ensure_ascii=False, separators=(',', ':'))
+    with open(output_file, 'wb') as f:
+        f.write(b'{"normalizedIndex":')
+        write_entry_index(f, normalized_index)
+        f.write(b',"prefixCache":')
+        write_entry_index(f, prefix_cache)
+        f.write(b'}')
     
     # Calculate file sizes
     original_size = json_file_path.stat().st_size
@@ -105,6 +76,18 @@ def process_dictionary(json_file_path, output_dir):
     print(f"  Indexes: {len(normalized_index)} normalized, {len(prefix_cache)} prefixes")
     print()
 
+def process_dictionary_captured(json_file_path, output_dir):
+    """Run process_dictionary in a worker and return its output, so logs don't interleave."""
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        try:
+            process_dictionary(json_file_path, output_dir)
+        except Exception as e:
+            print(f"  ERROR processing {json_file_path.name}: {e}")
+            traceback.print_exc(file=sys.stdout)
+            print()
+    return buffer.getvalue()
+
 def main():
     """Main function."""
     print("=" * 60)
@@ -143,15 +126,11 @@ def main():
     print("Pre-processing dictionaries...")
     print()
     
-    # Process each dictionary
-    for json_file in sorted(json_files):
-        try:
-            process_dictionary(json_file, output_dir)
-        except Exception as e:
-            print(f"  ERROR processing {json_file.name}: {e}")
-            import traceback
-            traceback.print_exc()
-            print()
+    # Process dictionaries in parallel (each language is independent)
+    tasks = [(json_file, output_dir) for json_file in sorted(json_files)]
+    with multiprocessing.Pool(min(len(tasks), os.cpu_count() or 1)) as pool:
+        for output in pool.starmap(process_dictionary_captured, tasks):
+            print(output, end='')
     
     # List generated files
     generated_files = list(output_dir.glob("*.dict"))
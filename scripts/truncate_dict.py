@@ -10,9 +10,10 @@ Usage examples:
 """
 
 import argparse
-import json
 import os
 
+from _symspell_common import dump_json, truncate_entries
+
 
 def truncate_dictionary(input_path: str, max_words: int):
     """
@@ -25,19 +26,9 @@ def truncate_dictionary(input_path: str, max_words: int):
     Returns:
         List of top N dictionary entries sorted by frequency
     """
-    with open(input_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    
-    if not isinstance(data, list):
-        raise ValueError(f"Expected JSON array, got {type(data)}")
-    
-    print(f"Loaded {len(data)} words from {input_path}")
-    
-    # Sort by frequency (descending) - ensure proper ordering
-    sorted_data = sorted(data, key=lambda x: int(x.get("f", 0)), reverse=True)
+    truncated, total = truncate_entries(input_path, max_words)
     
-    # Take top N words
-    truncated = sorted_data[:max_words]
+    print(f"Loaded {total} words from {input_path}")
     
     min_freq = truncated[-1].get("f", 0) if truncated else 0
     max_freq = truncated[0].get("f", 0) if truncated else 0
@@ -73,8 +64,7 @@ def main():
         os.makedirs(os.path.dirname(args.output), exist_ok=True)
         
         # Write truncated dictionary
-        with open(args.output, "w", encoding="utf-8") as f:
-            json.dump(truncated, f, ensure_ascii=False, indent=2)
+        dump_json(truncated, args.output, indent=True)
         
         print(f"Written truncated dictionary to {args.output}")
         return 0